@@ -1,23 +1,35 @@
 # External imports with version specifications
 import boto3  # v1.26.0
 import numpy as np  # v1.24.0
-import librosa  # v0.10.0
 import torch  # v2.0.0
+import torchaudio  # v2.0.1
 import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 import json
 import sys
+import time
 import logging
+from contextlib import nullcontext
 from functools import wraps
-from typing import Dict, List, Optional, Union
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Union
+from datetime import datetime, timezone
 
 # Global constants
 SUPPORTED_FORMATS = ['.wav', '.mp3', '.m4a', '.flac']
 MAX_AUDIO_DURATION = 14400  # 4 hours in seconds
 SAMPLE_RATE = 16000
 BATCH_SIZE = 32
+N_FFT = 2048  # Matches the librosa defaults the models were trained with
+HOP_LENGTH = 512
+DEFAULT_N_MFCC = 40
+DEFAULT_N_MELS = 128
+CHUNK_SECONDS = 30  # Streaming analysis window
+CHUNK_OVERLAP_SECONDS = 2
 MAX_RETRIES = 3
 TIMEOUT_SECONDS = 300
+POLL_INITIAL_DELAY = 1.0  # Transcription status polling backoff in seconds
+POLL_MAX_DELAY = 30.0
+POLL_BACKOFF_FACTOR = 1.5
 MODEL_PATHS = {
     'SPEAKER_MODEL': '/models/speaker_identification.pt',
     'LANGUAGE_MODEL': '/models/language_detection.pt'
@@ -29,34 +41,6 @@ SECURITY_CONFIG = {
 }
 
 # Decorator definitions
-def audit_log(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = datetime.utcnow()
-        try:
-            result = func(*args, **kwargs)
-            audit_data = {
-                'function': func.__name__,
-                'start_time': start_time.isoformat(),
-                'end_time': datetime.utcnow().isoformat(),
-                'status': 'success',
-                'evidence_id': kwargs.get('evidence_id', None)
-            }
-            logging.info(f"Audit log: {json.dumps(audit_data)}")
-            return result
-        except Exception as e:
-            audit_data = {
-                'function': func.__name__,
-                'start_time': start_time.isoformat(),
-                'end_time': datetime.utcnow().isoformat(),
-                'status': 'error',
-                'error': str(e),
-                'evidence_id': kwargs.get('evidence_id', None)
-            }
-            logging.error(f"Audit log: {json.dumps(audit_data)}")
-            raise
-    return wrapper
-
 def error_handler(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -67,27 +51,38 @@ def error_handler(func):
             raise
     return wrapper
 
-def validate_input(func):
+def cjis_instrumented(func):
+    """Validate inputs and emit a single audit/chain-of-custody record per call"""
     @wraps(func)
     def wrapper(self, evidence_id: str, file_path: str, *args, **kwargs):
-        if not evidence_id or not isinstance(evidence_id, str):
-            raise ValueError("Invalid evidence_id")
-        if not file_path or not any(file_path.lower().endswith(fmt) for fmt in SUPPORTED_FORMATS):
-            raise ValueError(f"Unsupported file format. Supported formats: {SUPPORTED_FORMATS}")
-        return func(self, evidence_id, file_path, *args, **kwargs)
-    return wrapper
-
-def maintain_chain_of_custody(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        custody_record = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'evidence_id': kwargs.get('evidence_id'),
-            'operation': func.__name__,
-            'handler': 'AudioProcessor'
-        }
-        logging.info(f"Chain of custody: {json.dumps(custody_record)}")
-        return func(*args, **kwargs)
+        start_time = time.time()
+        error = None
+        try:
+            if not evidence_id or not isinstance(evidence_id, str):
+                raise ValueError("Invalid evidence_id")
+            if not file_path or not any(file_path.lower().endswith(fmt) for fmt in SUPPORTED_FORMATS):
+                raise ValueError(f"Unsupported file format. Supported formats: {SUPPORTED_FORMATS}")
+            return func(self, evidence_id, file_path, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            level = logging.INFO if error is None else logging.ERROR
+            if logging.root.isEnabledFor(level):
+                end_time = time.time()
+                audit_data = {
+                    'function': func.__name__,
+                    'operation': func.__name__,
+                    'handler': 'AudioProcessor',
+                    'evidence_id': evidence_id,
+                    'start_time': datetime.fromtimestamp(start_time, timezone.utc).isoformat(),
+                    'end_time': datetime.fromtimestamp(end_time, timezone.utc).isoformat(),
+                    'duration': round(end_time - start_time, 3),
+                    'status': 'success' if error is None else 'error'
+                }
+                if error is not None:
+                    audit_data['error'] = str(error)
+                logging.log(level, f"Audit log: {json.dumps(audit_data)}")
     return wrapper
 
 class AudioProcessor:
@@ -113,52 +108,87 @@ class AudioProcessor:
         self.speaker_model = torch.jit.load(MODEL_PATHS['SPEAKER_MODEL']).to(self.device)
         self.language_model = torch.jit.load(MODEL_PATHS['LANGUAGE_MODEL']).to(self.device)
         
-        # Initialize multiprocessing pool
-        self.process_pool = multiprocessing.Pool(num_workers)
+        # Device-resident feature extractors sharing a single mel front-end
+        self.mel_transform = self._build_mel_transform(DEFAULT_N_MELS)
+        self.amplitude_to_db = torchaudio.transforms.AmplitudeToDB('power', top_db=80.0).to(self.device)
+        self.dct_mat = torchaudio.functional.create_dct(
+            DEFAULT_N_MFCC, DEFAULT_N_MELS, 'ortho').to(self.device)
+        
+        # Dedicated streams let the speaker and language heads overlap on the GPU
+        self.head_streams = {
+            'speaker': torch.cuda.Stream(self.device),
+            'language': torch.cuda.Stream(self.device)
+        } if self.device.type == 'cuda' else {}
+        
+        # Double-buffered pinned staging for asynchronous window uploads
+        self.pinned_windows = [
+            torch.empty(CHUNK_SECONDS * SAMPLE_RATE, dtype=torch.float32, pin_memory=True)
+            for _ in range(2)
+        ] if self.device.type == 'cuda' else []
+        self.pinned_events = [None] * len(self.pinned_windows)
+        
+        # Thread pool keeps models resident and shares audio without pickling;
+        # analysis tasks are GPU- or network-bound and release the GIL
+        self.executor = ThreadPoolExecutor(max_workers=num_workers)
         self.cache = {}
         
         self.logger.info("AudioProcessor initialized successfully")
 
-    @audit_log
-    @error_handler
-    @validate_input
-    @maintain_chain_of_custody
+    @cjis_instrumented
     def process_audio(self, evidence_id: str, file_path: str, 
                      analysis_types: List[str], options: Dict) -> Dict:
         """Process audio file with parallel analysis capabilities"""
         try:
-            # Load and validate audio file
-            audio_data, sr = librosa.load(file_path, sr=SAMPLE_RATE)
-            if len(audio_data) / sr > MAX_AUDIO_DURATION:
+            # Validate audio file from its header, samples are streamed later.
+            # Compressed streams may not record a frame count (num_frames == 0),
+            # in which case the limit is enforced while decoding instead
+            info = torchaudio.info(file_path)
+            duration = info.num_frames / info.sample_rate if info.num_frames > 0 else None
+            if duration is not None and duration > MAX_AUDIO_DURATION:
                 raise ValueError(f"Audio duration exceeds maximum limit of {MAX_AUDIO_DURATION} seconds")
+            decode_stats = {}
 
             results = {}
-            tasks = []
+            futures = {}
+            
+            # Speaker and language heads share one streamed pass over the audio
+            heads = [head for head in ('speaker_identification', 'language_detection')
+                     if head in analysis_types]
+            if duration is None and not heads:
+                # Nothing else decodes the file, so decode once just to measure it
+                for _ in self._stream_windows(file_path, decode_stats):
+                    pass
 
             # Distribute analysis tasks
             if 'transcription' in analysis_types:
-                tasks.append(self.process_pool.apply_async(
-                    self.transcribe_audio, (file_path, options)))
+                futures['transcription'] = self.executor.submit(
+                    self.transcribe_audio, file_path, options)
             
-            if 'speaker_identification' in analysis_types:
-                tasks.append(self.process_pool.apply_async(
-                    self.identify_speakers, (audio_data, options)))
+            if heads:
+                head_outputs = self._stream_spectral_heads(file_path, heads, options, decode_stats)
                 
-            if 'language_detection' in analysis_types:
-                tasks.append(self.process_pool.apply_async(
-                    self.detect_language, (audio_data, options)))
+                if 'speaker_identification' in head_outputs:
+                    results['speaker_identification'] = self.identify_speakers(
+                        head_outputs['speaker_identification'], options)
+                    
+                if 'language_detection' in head_outputs:
+                    results['language_detection'] = self.detect_language(
+                        head_outputs['language_detection'], options)
 
             # Collect results
-            for task, analysis_type in zip(tasks, analysis_types):
-                results[analysis_type] = task.get(timeout=TIMEOUT_SECONDS)
+            for analysis_type, future in futures.items():
+                results[analysis_type] = future.result(timeout=TIMEOUT_SECONDS)
+            
+            if duration is None:
+                duration = decode_stats['decoded_seconds']
 
             return {
                 'evidence_id': evidence_id,
                 'results': results,
                 'metadata': {
                     'processed_at': datetime.utcnow().isoformat(),
-                    'duration': len(audio_data) / sr,
-                    'sample_rate': sr
+                    'duration': duration,
+                    'sample_rate': SAMPLE_RATE
                 }
             }
 
@@ -166,6 +196,134 @@ class AudioProcessor:
             self.logger.error(f"Error processing audio {evidence_id}: {str(e)}")
             raise
 
+    def _build_mel_transform(self, n_mels: int) -> torchaudio.transforms.MelSpectrogram:
+        """Create a librosa-compatible mel spectrogram transform on the processing device"""
+        return torchaudio.transforms.MelSpectrogram(
+            sample_rate=SAMPLE_RATE,
+            n_fft=N_FFT,
+            hop_length=HOP_LENGTH,
+            n_mels=n_mels,
+            pad_mode='constant',
+            norm='slaney',
+            mel_scale='slaney'
+        ).to(self.device)
+
+    def _stream_windows(self, file_path: str,
+                        stats: Optional[Dict] = None) -> Iterator[torch.Tensor]:
+        """
+        Decode the file as overlapping mono windows resampled to SAMPLE_RATE,
+        enforcing MAX_AUDIO_DURATION on the decoded sample count. The decoded
+        duration is stored in ``stats['decoded_seconds']`` when given.
+        """
+        overlap = CHUNK_OVERLAP_SECONDS * SAMPLE_RATE
+        max_samples = MAX_AUDIO_DURATION * SAMPLE_RATE
+        decoded = 0
+        reader = torchaudio.io.StreamReader(file_path)
+        reader.add_basic_audio_stream(
+            frames_per_chunk=CHUNK_SECONDS * SAMPLE_RATE - overlap,
+            sample_rate=SAMPLE_RATE
+        )
+        
+        tail = None
+        for (chunk,) in reader.stream():
+            # Downmix (frames, channels) to mono like librosa.load did
+            chunk = chunk.mean(dim=1)
+            decoded += chunk.shape[0]
+            if decoded > max_samples:
+                raise ValueError(f"Audio duration exceeds maximum limit of {MAX_AUDIO_DURATION} seconds")
+            yield chunk if tail is None else torch.cat([tail, chunk])
+            tail = chunk[-overlap:]
+        
+        if stats is not None:
+            stats['decoded_seconds'] = decoded / SAMPLE_RATE
+
+    def _upload_window(self, window: torch.Tensor, window_idx: int) -> torch.Tensor:
+        """Copy an audio window to the device through a pinned staging buffer"""
+        if not self.pinned_windows:
+            return window
+        
+        slot = window_idx % len(self.pinned_windows)
+        # Wait until the previous upload out of this buffer has completed
+        if self.pinned_events[slot] is not None:
+            self.pinned_events[slot].synchronize()
+        
+        staging = self.pinned_windows[slot][:window.shape[0]]
+        staging.copy_(window)
+        device_window = staging.to(self.device, non_blocking=True)
+        
+        event = torch.cuda.Event()
+        event.record()
+        self.pinned_events[slot] = event
+        return device_window
+
+    def _stream_spectral_heads(self, file_path: str, heads: List[str], options: Dict,
+                               stats: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """Run the speaker and language heads window by window and aggregate their outputs"""
+        n_mels = options.get('n_mels', DEFAULT_N_MELS)
+        n_mfcc = options.get('n_mfcc', DEFAULT_N_MFCC)
+        outputs = {head: [] for head in heads}
+        use_fp16 = self.device.type == 'cuda'
+        
+        # Head outputs stay on the device so decoding the next window
+        # overlaps with inference on the current one
+        with torch.no_grad():
+            for window_idx, window in enumerate(self._stream_windows(file_path, stats)):
+                mel = self._shared_mel(self._upload_window(window, window_idx), n_mels)
+                
+                if 'speaker_identification' in outputs:
+                    with self._head_stream('speaker', mel):
+                        features_tensor = self._mfcc_from_mel(mel, n_mfcc).unsqueeze(0)
+                        with torch.autocast(self.device.type, dtype=torch.float16, enabled=use_fp16):
+                            embedding = self.speaker_model(features_tensor)
+                        # Mean-pool frame embeddings into one per window
+                        if embedding.dim() > 2:
+                            embedding = embedding.mean(dim=1)
+                        outputs['speaker_identification'].append(embedding.float())
+                        
+                if 'language_detection' in outputs:
+                    with self._head_stream('language', mel):
+                        with torch.autocast(self.device.type, dtype=torch.float16, enabled=use_fp16):
+                            language_probs = self.language_model(mel.unsqueeze(0))
+                        outputs['language_detection'].append(language_probs.float())
+            
+            for stream in self.head_streams.values():
+                torch.cuda.current_stream(self.device).wait_stream(stream)
+        
+        aggregated = {}
+        if outputs.get('speaker_identification'):
+            aggregated['speaker_identification'] = torch.cat(
+                outputs['speaker_identification']).cpu().numpy()
+        if outputs.get('language_detection'):
+            aggregated['language_detection'] = torch.stack(
+                outputs['language_detection']).mean(dim=0).cpu().numpy()
+        return aggregated
+
+    def _shared_mel(self, audio: torch.Tensor, n_mels: int) -> torch.Tensor:
+        """Compute the power mel spectrogram once on device for all spectral analyses"""
+        mel_transform = (self.mel_transform if n_mels == self.mel_transform.n_mels
+                         else self._build_mel_transform(n_mels))
+        with torch.no_grad():
+            return mel_transform(audio.to(self.device))
+
+    def _mfcc_from_mel(self, mel: torch.Tensor, n_mfcc: int) -> torch.Tensor:
+        """Derive MFCCs from a power mel spectrogram (log scaling + DCT)"""
+        if n_mfcc == DEFAULT_N_MFCC and mel.shape[-2] == DEFAULT_N_MELS:
+            dct_mat = self.dct_mat
+        else:
+            dct_mat = torchaudio.functional.create_dct(n_mfcc, mel.shape[-2], 'ortho').to(self.device)
+        log_mel = self.amplitude_to_db(mel)
+        return torch.matmul(log_mel.transpose(-1, -2), dct_mat).transpose(-1, -2)
+
+    def _head_stream(self, head: str, features: torch.Tensor):
+        """Run a model head on its own CUDA stream once the shared features are ready"""
+        stream = self.head_streams.get(head)
+        if stream is None:
+            return nullcontext()
+        stream.wait_stream(torch.cuda.default_stream(self.device))
+        # Keep the allocator from recycling the features while the head reads them
+        features.record_stream(stream)
+        return torch.cuda.stream(stream)
+
     @error_handler
     def transcribe_audio(self, file_path: str, options: Dict) -> Dict:
         """Secure audio transcription with AWS Transcribe"""
@@ -186,13 +344,15 @@ class AudioProcessor:
                 }
             )
 
-            # Wait for completion
+            # Wait for completion with exponential backoff
+            delay = POLL_INITIAL_DELAY
             while True:
                 status = self.transcribe_client.get_transcription_job(
                     TranscriptionJobName=job_name)
                 if status['TranscriptionJob']['TranscriptionJobStatus'] in ['COMPLETED', 'FAILED']:
                     break
-                time.sleep(5)
+                time.sleep(delay)
+                delay = min(delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY)
 
             if status['TranscriptionJob']['TranscriptionJobStatus'] == 'COMPLETED':
                 transcript_uri = status['TranscriptionJob']['Transcript']['TranscriptFileUri']
@@ -216,26 +376,12 @@ class AudioProcessor:
                 self.logger.warning(f"Cleanup error: {str(cleanup_error)}")
 
     @error_handler
-    def identify_speakers(self, audio_data: np.ndarray, options: Dict) -> Dict:
-        """GPU-accelerated speaker identification"""
+    def identify_speakers(self, speaker_embeddings: np.ndarray, options: Dict) -> Dict:
+        """Speaker identification from per-window speaker embeddings"""
         try:
-            # Prepare audio features
-            features = librosa.feature.mfcc(
-                y=audio_data, 
-                sr=SAMPLE_RATE,
-                n_mfcc=options.get('n_mfcc', 40)
-            )
-            
-            # Convert to torch tensor and move to device
-            features_tensor = torch.FloatTensor(features).unsqueeze(0).to(self.device)
-            
-            # Model inference
-            with torch.no_grad():
-                speaker_embeddings = self.speaker_model(features_tensor)
-                
             # Post-process results
             speaker_segments = self._process_speaker_embeddings(
-                speaker_embeddings.cpu().numpy(),
+                speaker_embeddings,
                 options.get('min_segment_duration', 1.0)
             )
             
@@ -252,26 +398,12 @@ class AudioProcessor:
             raise
 
     @error_handler
-    def detect_language(self, audio_data: np.ndarray, options: Dict) -> Dict:
-        """Multi-language detection with confidence scoring"""
+    def detect_language(self, language_probs: np.ndarray, options: Dict) -> Dict:
+        """Multi-language detection from window-averaged language probabilities"""
         try:
-            # Prepare audio features
-            features = librosa.feature.melspectrogram(
-                y=audio_data,
-                sr=SAMPLE_RATE,
-                n_mels=options.get('n_mels', 128)
-            )
-            
-            # Convert to torch tensor and move to device
-            features_tensor = torch.FloatTensor(features).unsqueeze(0).to(self.device)
-            
-            # Model inference
-            with torch.no_grad():
-                language_probs = self.language_model(features_tensor)
-                
             # Post-process results
             language_predictions = self._process_language_predictions(
-                language_probs.cpu().numpy(),
+                language_probs,
                 threshold=options.get('confidence_threshold', 0.5)
             )
             
@@ -2,15 +2,23 @@
 import numpy as np  # v1.24.0
 import cv2  # v4.8.0
 import torch  # v2.0.0
+import torch.nn.functional as F  # v2.0.0
+import torchvision  # v0.15.1
+from PIL import Image  # v10.0.0
 from transformers import AutoImageProcessor, AutoModelForObjectDetection  # v4.30.0
 import pytesseract  # v0.3.10
 import json
 import argparse
 import logging
 import gc
+import os
+import sys
+import time
+import datetime
+from types import SimpleNamespace
 from threading import Lock
 from functools import wraps
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Union, Optional, Tuple
 
 # Global configurations
 MODEL_CONFIGS = {
@@ -18,7 +26,8 @@ MODEL_CONFIGS = {
         'model_name': 'yolov5',
         'confidence_threshold': 0.5,
         'nms_threshold': 0.45,
-        'batch_size': 16
+        'batch_size': 16,
+        'precision': 'fp32'  # 'int8' quantizes linear layers on CPU
     },
     'FACE_DETECTION': {
         'model_name': 'retinaface',
@@ -27,14 +36,27 @@ MODEL_CONFIGS = {
         'batch_size': 8
     },
     'OCR': {
+        'engine': 'paddle',  # 'tesseract' for hosts without a GPU
+        'paddle_lang': 'en',
         'lang': 'eng',
         'config': '--oem 3 --psm 11',
         'min_confidence': 0.6
     }
 }
 
+INFERENCE_BACKEND = os.environ.get('CRIMEMINER_INFERENCE_BACKEND', 'pytorch')
+ONNX_CACHE_DIR = os.environ.get('CRIMEMINER_ONNX_CACHE_DIR', '/models/onnx-cache')
+DETR_MODEL_NAME = 'facebook/detr-resnet-50'
+
 SUPPORTED_IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
 MAX_IMAGE_SIZE = 4096
+JPEG_FORMATS = ['.jpg', '.jpeg']
+EXIF_ORIENTATION_TAG = 0x0112
+REDUCED_DECODE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+]
 RESOURCE_LIMITS = {
     'max_batch_size': 32,
     'max_memory_usage': 0.8,
@@ -55,7 +77,6 @@ def error_handler(func):
 def performance_tracker(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        import time
         start_time = time.time()
         result = func(*args, **kwargs)
         duration = time.time() - start_time
@@ -63,14 +84,50 @@ def performance_tracker(func):
         return result
     return wrapper
 
+def cjis_instrumented(func):
+    """Emit a single audit/chain-of-custody record with timing per call"""
+    @wraps(func)
+    def wrapper(evidence_id: str, *args, **kwargs):
+        start_time = time.time()
+        error = None
+        try:
+            return func(evidence_id, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            level = logging.INFO if error is None else logging.ERROR
+            if logging.root.isEnabledFor(level):
+                end_time = time.time()
+                audit_data = {
+                    'function': func.__name__,
+                    'operation': func.__name__,
+                    'handler': 'ImageProcessor',
+                    'evidence_id': evidence_id,
+                    'start_time': datetime.datetime.fromtimestamp(start_time, datetime.timezone.utc).isoformat(),
+                    'end_time': datetime.datetime.fromtimestamp(end_time, datetime.timezone.utc).isoformat(),
+                    'duration': round(end_time - start_time, 3),
+                    'status': 'success' if error is None else 'error'
+                }
+                if error is not None:
+                    audit_data['error'] = str(error)
+                logging.log(level, f"Audit log: {json.dumps(audit_data)}")
+    return wrapper
+
 def cuda_optimizer(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if torch.cuda.is_available():
-            with torch.cuda.device(0):
-                torch.cuda.empty_cache()
+        # Keep the caching allocator warm; only release it to recover from OOM
+        try:
+            with torch.inference_mode():
+                if torch.cuda.is_available():
+                    with torch.cuda.device(0):
+                        return func(*args, **kwargs)
                 return func(*args, **kwargs)
-        return func(*args, **kwargs)
+        except torch.cuda.OutOfMemoryError:
+            gc.collect()
+            torch.cuda.empty_cache()
+            raise
     return wrapper
 
 def thread_safe(cls):
@@ -81,6 +138,63 @@ def thread_safe(cls):
     cls.__init__ = __init__
     return cls
 
+class OnnxObjectDetector:
+    """DETR served through ONNX Runtime with the TensorRT execution provider"""
+
+    def __init__(self, model_name: str, device: torch.device):
+        # Only constructed for the opt-in tensorrt backend, PyTorch remains the default
+        import onnxruntime as ort  # v1.15.1
+        
+        self.device = device
+        arch = 'cpu'
+        if torch.cuda.is_available():
+            major, minor = torch.cuda.get_device_capability(device)
+            arch = f"sm{major}{minor}"
+        cache_dir = os.path.join(ONNX_CACHE_DIR, f"{model_name.replace('/', '--')}-{arch}")
+        onnx_path = os.path.join(cache_dir, 'model.onnx')
+
+        if not os.path.exists(onnx_path):
+            os.makedirs(cache_dir, exist_ok=True)
+            model = AutoModelForObjectDetection.from_pretrained(model_name).eval()
+            # Export beside the cache and rename into place, so an interrupted
+            # export never leaves a partial model.onnx behind
+            partial_path = f"{onnx_path}.{os.getpid()}.tmp"
+            torch.onnx.export(
+                model,
+                (torch.randn(1, 3, 800, 800),),
+                partial_path,
+                input_names=['pixel_values'],
+                output_names=['logits', 'pred_boxes'],
+                dynamic_axes={
+                    'pixel_values': {0: 'batch', 2: 'height', 3: 'width'},
+                    'logits': {0: 'batch'},
+                    'pred_boxes': {0: 'batch'}
+                },
+                opset_version=17
+            )
+            os.replace(partial_path, onnx_path)
+            logging.info(f"Exported {model_name} to ONNX at {onnx_path}")
+
+        self.session = ort.InferenceSession(onnx_path, providers=[
+            ('TensorrtExecutionProvider', {
+                'trt_fp16_enable': True,
+                'trt_engine_cache_enable': True,
+                'trt_engine_cache_path': cache_dir
+            }),
+            'CUDAExecutionProvider',
+            'CPUExecutionProvider'
+        ])
+
+    def __call__(self, pixel_values: torch.Tensor, **kwargs) -> SimpleNamespace:
+        logits, pred_boxes = self.session.run(
+            None, {'pixel_values': pixel_values.cpu().numpy()}
+        )
+        # Same fields as DetrObjectDetectionOutput, so post-processing is shared
+        return SimpleNamespace(
+            logits=torch.from_numpy(logits).to(self.device),
+            pred_boxes=torch.from_numpy(pred_boxes).to(self.device)
+        )
+
 @thread_safe
 class ImageProcessor:
     def __init__(self, analysis_types: List[str], config: Dict = None):
@@ -89,6 +203,7 @@ class ImageProcessor:
         self.config = config or MODEL_CONFIGS
         self.cache = {}
         self.model_lock = Lock()
+        self.ocr_engine = None
         
         logging.info(f"Initializing ImageProcessor with device: {self.device}")
         self._initialize_models(analysis_types)
@@ -96,9 +211,16 @@ class ImageProcessor:
     def _initialize_models(self, analysis_types: List[str]) -> None:
         with self.model_lock:
             if 'OBJECT_DETECTION' in analysis_types:
-                self.models['object_detection'] = AutoModelForObjectDetection.from_pretrained(
-                    'facebook/detr-resnet-50'
-                ).to(self.device)
+                self.image_processor = AutoImageProcessor.from_pretrained(DETR_MODEL_NAME)
+                if INFERENCE_BACKEND == 'tensorrt':
+                    self.models['object_detection'] = OnnxObjectDetector(
+                        DETR_MODEL_NAME, self.device
+                    )
+                else:
+                    model = AutoModelForObjectDetection.from_pretrained(DETR_MODEL_NAME).eval()
+                    if self.config['OBJECT_DETECTION'].get('precision') == 'int8':
+                        model = self._quantize_int8(model)
+                    self.models['object_detection'] = model.to(self.device)
                 
             if 'FACE_DETECTION' in analysis_types:
                 self.models['face_detection'] = torch.hub.load(
@@ -107,31 +229,80 @@ class ImageProcessor:
                     pretrained=True
                 ).to(self.device)
 
+            if 'OCR' in analysis_types and self.config['OCR'].get('engine') == 'paddle':
+                # Only paddle hosts need paddle installed, tesseract hosts skip it
+                from paddleocr import PaddleOCR  # v2.7.0
+                
+                self.ocr_engine = PaddleOCR(
+                    use_angle_cls=True,
+                    lang=self.config['OCR']['paddle_lang'],
+                    use_gpu=torch.cuda.is_available(),
+                    show_log=False
+                )
+
+    def _quantize_int8(self, model: torch.nn.Module) -> torch.nn.Module:
+        # Dynamic int8 kernels only exist on CPU; GPUs keep fp16 autocast
+        if self.device.type != 'cpu':
+            logging.warning("int8 precision is only supported on CPU, keeping fp16 inference")
+            return model
+        # DETR's transformer encoder/decoder is dominated by linear layers
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
     @cuda_optimizer
-    def detect_objects(self, image: np.ndarray, model_config: Dict) -> List[Dict]:
-        processor = AutoImageProcessor.from_pretrained('facebook/detr-resnet-50')
-        inputs = processor(images=image, return_tensors="pt").to(self.device)
-        
-        with torch.no_grad():
-            outputs = self.models['object_detection'](**inputs)
-        
+    def detect_objects_batch(self, images: List[np.ndarray], model_config: Dict) -> List[List[Dict]]:
+        batch_size = model_config.get('batch_size', RESOURCE_LIMITS['max_batch_size'])
         results = []
-        for score, label, box in zip(
-            outputs.scores[0].cpu().numpy(),
-            outputs.labels[0].cpu().numpy(),
-            outputs.boxes[0].cpu().numpy()
-        ):
-            if score >= model_config['confidence_threshold']:
-                results.append({
-                    'bbox': box.tolist(),
-                    'confidence': float(score),
-                    'label': label.item()
-                })
+        
+        for start in range(0, len(images), batch_size):
+            batch = images[start:start + batch_size]
+            # Pad to a common size so the batch runs as a single forward pass
+            inputs = self.image_processor(
+                images=batch, return_tensors="pt", do_pad=True
+            ).to(self.device)
+            
+            with torch.inference_mode(), torch.autocast(
+                self.device.type, dtype=torch.float16, enabled=self.device.type == 'cuda'
+            ):
+                outputs = self.models['object_detection'](**inputs)
+            
+            # Threshold on the device and copy back only the surviving queries,
+            # with boxes scaled to each image's pixel coordinates. Autocast leaves
+            # fp16 outputs; softmax and box scaling need fp32 to match the scores
+            target_sizes = torch.tensor([image.shape[:2] for image in batch], device=self.device)
+            per_image = self.image_processor.post_process_object_detection(
+                SimpleNamespace(logits=outputs.logits.float(), pred_boxes=outputs.pred_boxes.float()),
+                threshold=model_config['confidence_threshold'],
+                target_sizes=target_sizes
+            )
+            
+            for detected in per_image:
+                scores = detected['scores'].cpu().numpy()
+                labels = detected['labels'].cpu().numpy()
+                boxes = detected['boxes'].cpu().numpy()
+                results.append([
+                    {
+                        'bbox': box.tolist(),
+                        'confidence': float(score),
+                        'label': int(label)
+                    }
+                    for score, label, box in zip(scores, labels, boxes)
+                ])
         
         return results
 
+    def detect_objects(self, image: np.ndarray, model_config: Dict) -> List[Dict]:
+        return self.detect_objects_batch([image], model_config)[0]
+
     @error_handler
     def process_ocr(self, image: np.ndarray) -> Dict:
+        if self.ocr_engine is not None:
+            # Text and per-line confidence come from a single forward pass
+            lines = self.ocr_engine.ocr(image, cls=True)[0] or []
+            return {
+                'text': '\n'.join(line[1][0] for line in lines),
+                'confidence': float(np.mean([line[1][1] for line in lines])) if lines else 0.0
+            }
+
         ocr_config = self.config['OCR']
         text = pytesseract.image_to_string(
             image,
@@ -146,24 +317,81 @@ class ImageProcessor:
             output_type=pytesseract.Output.DICT
         )
         
+        # Tesseract reports -1 for non-word boxes; filter them in one vectorized pass
+        conf_arr = np.asarray(confidence['conf'], dtype=np.float32)
+        word_conf = conf_arr[conf_arr != -1]
+        
+        # Tesseract scores 0-100; report 0-1 like the paddle path and min_confidence
         return {
             'text': text,
-            'confidence': float(np.mean([conf for conf in confidence['conf'] if conf != -1]))
+            'confidence': float(word_conf.mean()) / 100.0 if word_conf.size else 0.0
         }
 
+    def _load_image(self, image_path: str) -> Tuple[np.ndarray, int, int]:
+        """Decode an image clamped to MAX_IMAGE_SIZE, returning it with its original size"""
+        # Header-only read, pixel data is not decoded here
+        try:
+            with Image.open(image_path) as header:
+                width, height = header.size
+                orientation = header.getexif().get(EXIF_ORIENTATION_TAG, 1)
+        except Image.DecompressionBombError:
+            # PIL refuses to open very large images at all; take the size from
+            # a full cv2 decode instead
+            width = height = orientation = None
+        except OSError as e:
+            raise ValueError(f"Failed to load image: {image_path}") from e
+        # cv2.imread applies EXIF orientation; orientations 5-8 swap the axes
+        if orientation in (5, 6, 7, 8):
+            width, height = height, width
+        longest = max(width, height) if width is not None else 0
+        scale = MAX_IMAGE_SIZE / longest if longest > MAX_IMAGE_SIZE else 1.0
+        
+        # nvJPEG ignores EXIF orientation, so rotated photos stay on the cv2 path
+        if (self.device.type == 'cuda' and orientation == 1
+                and os.path.splitext(image_path)[1].lower() in JPEG_FORMATS):
+            try:
+                # nvJPEG decode and resize on the GPU
+                raw = torchvision.io.read_file(image_path)
+                image = torchvision.io.decode_jpeg(
+                    raw, mode=torchvision.io.ImageReadMode.RGB, device=self.device
+                )
+                if scale < 1.0:
+                    image = F.interpolate(
+                        image.unsqueeze(0).float(),
+                        size=(int(height * scale), int(width * scale)),
+                        mode='bilinear',
+                        antialias=True
+                    ).squeeze(0).round().clamp(0, 255).byte()
+                # RGB CHW to the BGR HWC layout used by the rest of the pipeline
+                return image.flip(0).permute(1, 2, 0).contiguous().cpu().numpy(), width, height
+            except RuntimeError as e:
+                # CMYK and other JPEGs nvJPEG cannot handle
+                logging.warning(f"nvJPEG could not decode {image_path}, falling back to CPU: {str(e)}")
+        
+        # Let libjpeg downscale during decode when the image is large enough
+        flags = cv2.IMREAD_COLOR
+        for factor, reduced_flag in REDUCED_DECODE_FLAGS:
+            if longest // factor >= MAX_IMAGE_SIZE:
+                flags = reduced_flag
+                break
+        
+        image = cv2.imread(image_path, flags)
+        if image is None:
+            raise ValueError(f"Failed to load image: {image_path}")
+        if width is None:
+            height, width = image.shape[:2]
+        
+        if max(image.shape[:2]) > MAX_IMAGE_SIZE:
+            decoded_scale = MAX_IMAGE_SIZE / max(image.shape[:2])
+            image = cv2.resize(image, None, fx=decoded_scale, fy=decoded_scale,
+                               interpolation=cv2.INTER_AREA)
+        return image, width, height
+
     @performance_tracker
     def process(self, image_path: str, options: Dict) -> Dict:
         try:
-            # Image loading and validation
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Failed to load image: {image_path}")
-            
-            # Resize if necessary
-            height, width = image.shape[:2]
-            if max(height, width) > MAX_IMAGE_SIZE:
-                scale = MAX_IMAGE_SIZE / max(height, width)
-                image = cv2.resize(image, None, fx=scale, fy=scale)
+            # Image loading, validation and downscaling
+            image, width, height = self._load_image(image_path)
             
             results = {
                 'metadata': {
@@ -183,19 +411,13 @@ class ImageProcessor:
             if 'ocr' in options:
                 results['analysis']['ocr'] = self.process_ocr(image)
             
-            # Cleanup
-            gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            
             return results
             
         except Exception as e:
             logging.error(f"Error processing image {image_path}: {str(e)}")
             raise
 
-@error_handler
-@performance_tracker
+@cjis_instrumented
 def main(evidence_id: str, file_path: str, analysis_types: List[str], processing_options: Dict) -> str:
     # Validate input parameters
     if not evidence_id or not file_path:
@@ -209,7 +431,7 @@ def main(evidence_id: str, file_path: str, analysis_types: List[str], processing
     
     # Add metadata
     results['evidence_id'] = evidence_id
-    results['processing_timestamp'] = str(datetime.datetime.now(datetime.UTC))
+    results['processing_timestamp'] = str(datetime.datetime.now(datetime.timezone.utc))
     
     return json.dumps(results)
 
@@ -4,9 +4,13 @@ Implements CJIS-compliant NLP capabilities with caching and audit logging
 Version: 1.0.0
 """
 
+import bisect
+import hashlib
 import json
 import logging
-from typing import Dict, List, Optional, Callable, Any
+import os
+import tempfile
+from typing import Dict, List, Optional, Callable, Any, Tuple
 import numpy as np
 import torch
 from transformers import (
@@ -15,10 +19,13 @@ from transformers import (
     AutoModelForTokenClassification,
     pipeline
 )
+import fasttext
 import spacy
-from cachetools import TTLCache, keys
+import redis
+from cachetools import TTLCache
 import functools
 import time
+from contextvars import ContextVar
 
 # Version-controlled constants
 SUPPORTED_LANGUAGES = ['en', 'es', 'fr', 'de', 'it']
@@ -26,12 +33,42 @@ ENTITY_TYPES = ['PERSON', 'ORGANIZATION', 'LOCATION', 'DATE', 'TIME', 'MONEY', '
 CONFIDENCE_THRESHOLD = 0.75
 CACHE_TTL = 3600  # 1 hour cache lifetime
 MAX_BATCH_SIZE = 32
+MAX_SEQUENCE_LENGTH = 512  # Transformer context window in tokens
+MAX_CONTENT_BYTES = 1_000_000  # 1MB limit
+SENTENCE_BATCH_SIZE = 64
+INFERENCE_BACKEND = os.environ.get('CRIMEMINER_INFERENCE_BACKEND', 'pytorch')
+ONNX_CACHE_DIR = os.environ.get('CRIMEMINER_ONNX_CACHE_DIR', '/models/onnx-cache')
+LANGUAGE_ID_MODEL_PATH = os.environ.get('CRIMEMINER_LANGUAGE_ID_MODEL', '/models/lid.176.ftz')
 MODEL_VERSIONS = {
     'entity': 'v1.2.0',
     'sentiment': 'v2.0.1',
     'language': 'v1.0.3'
 }
 
+def _check_text_content(text_content: Any) -> None:
+    """
+    Raise ValueError if text content is missing, not a string or oversized
+    """
+    if not text_content or not isinstance(text_content, str):
+        raise ValueError("Invalid text content provided")
+        
+    if len(text_content.encode('utf-8')) > MAX_CONTENT_BYTES:
+        raise ValueError("Text content exceeds size limit")
+
+# (text, digest) of the request being processed, so every log site shares one hash
+_current_digest: ContextVar[Optional[Tuple[str, str]]] = ContextVar('current_digest', default=None)
+
+def _content_digest(text_content: str) -> str:
+    """
+    Stable SHA-256 digest of text content for cache keys and audit logs
+    
+    Reuses the digest computed at validation when called for the same text.
+    """
+    current = _current_digest.get()
+    if current is not None and current[0] is text_content:
+        return current[1]
+    return hashlib.sha256(text_content.encode('utf-8')).hexdigest()
+
 def validate_input(func: Callable) -> Callable:
     """
     Decorator for input validation with CJIS compliance logging
@@ -42,23 +79,24 @@ def validate_input(func: Callable) -> Callable:
             # Extract text content from args (assuming first arg after self)
             text_content = args[1] if len(args) > 1 else kwargs.get('text_content')
             
-            if not text_content or not isinstance(text_content, str):
-                raise ValueError("Invalid text content provided")
-                
-            if len(text_content.encode('utf-8')) > 1_000_000:  # 1MB limit
-                raise ValueError("Text content exceeds size limit")
+            _check_text_content(text_content)
+            digest = hashlib.sha256(text_content.encode('utf-8')).hexdigest()
                 
             # Log validation with CJIS compliance
             logging.info(
                 "Input validation",
                 extra={
                     'event_type': 'validation',
-                    'content_hash': hash(text_content),
+                    'content_hash': digest,
                     'timestamp': time.time()
                 }
             )
             
-            return func(*args, **kwargs)
+            token = _current_digest.set((text_content, digest))
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current_digest.reset(token)
             
         except Exception as e:
             logging.error(
@@ -73,39 +111,84 @@ def validate_input(func: Callable) -> Callable:
             
     return wrapper
 
+def _json_default(value: Any) -> Any:
+    """
+    Serialize numpy scalars returned by the model pipelines
+    """
+    return value.item() if hasattr(value, 'item') else str(value)
+
 def cache_result(func: Callable) -> Callable:
     """
     Decorator for result caching with security considerations
+    
+    Results are keyed by content digest so large texts are hashed once, and
+    are shared across workers through Redis when a cache server is configured.
     """
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
         try:
             # Generate secure cache key
-            cache_key = keys.hashkey(args, frozenset(kwargs.items()))
+            text_content = args[0] if args else kwargs['text_content']
+            digest = _content_digest(text_content)
+            params = dict(zip(('analysis_types', 'options'), args[1:]))
+            params.update((k, v) for k, v in kwargs.items() if k != 'text_content')
+            cache_key = f"tp:{digest}:{json.dumps(params, sort_keys=True, default=str)}"
             
-            # Check cache
-            if cache_key in self.result_cache:
+            # Check local cache, then the shared cache
+            result = self.result_cache.get(cache_key)
+            if result is None and self.redis_client is not None:
+                try:
+                    cached = self.redis_client.get(cache_key)
+                except redis.RedisError as e:
+                    logging.warning(
+                        f"Shared cache unavailable: {str(e)}",
+                        extra={
+                            'event_type': 'cache_error',
+                            'error_type': type(e).__name__,
+                            'timestamp': time.time()
+                        }
+                    )
+                    cached = None
+                if cached is not None:
+                    result = json.loads(cached)
+                    self.result_cache[cache_key] = result
+                    
+            if result is not None:
                 logging.info(
                     "Cache hit",
                     extra={
                         'event_type': 'cache_hit',
-                        'cache_key': hash(cache_key),
+                        'content_digest': digest,
                         'timestamp': time.time()
                     }
                 )
-                return self.result_cache[cache_key]
+                return result
                 
             # Execute function
             result = func(self, *args, **kwargs)
             
             # Cache result
             self.result_cache[cache_key] = result
+            if self.redis_client is not None:
+                try:
+                    self.redis_client.setex(
+                        cache_key, CACHE_TTL, json.dumps(result, default=_json_default)
+                    )
+                except redis.RedisError as e:
+                    logging.warning(
+                        f"Shared cache unavailable: {str(e)}",
+                        extra={
+                            'event_type': 'cache_error',
+                            'error_type': type(e).__name__,
+                            'timestamp': time.time()
+                        }
+                    )
             
             logging.info(
                 "Cache update",
                 extra={
                     'event_type': 'cache_update',
-                    'cache_key': hash(cache_key),
+                    'content_digest': digest,
                     'timestamp': time.time()
                 }
             )
@@ -142,8 +225,10 @@ class TextProcessor:
         )
         self.audit_logger = logging.getLogger('text_processor')
         
-        # Initialize cache
+        # Initialize local cache and optional shared cache
         self.result_cache = TTLCache(maxsize=1000, ttl=CACHE_TTL)
+        redis_url = (config or {}).get('redis_url')
+        self.redis_client = redis.Redis.from_url(redis_url) if redis_url else None
         
         # Configure device
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -166,22 +251,50 @@ class TextProcessor:
         Load and configure NLP models with version control
         """
         try:
-            # Entity recognition model
-            self.entity_model = pipeline(
-                'ner',
-                model=f"crimeminer/entity-detection-{MODEL_VERSIONS['entity']}",
-                device=self.device
-            )
+            entity_model_name = f"crimeminer/entity-detection-{MODEL_VERSIONS['entity']}"
+            sentiment_model_name = f"crimeminer/sentiment-{MODEL_VERSIONS['sentiment']}"
+            
+            if INFERENCE_BACKEND == 'tensorrt':
+                # ONNX Runtime with TensorRT engines, PyTorch remains the default
+                from optimum.onnxruntime import (
+                    ORTModelForSequenceClassification,
+                    ORTModelForTokenClassification
+                )
+                self.entity_model = self._load_onnx_pipeline(
+                    'ner', ORTModelForTokenClassification, entity_model_name
+                )
+                self.sentiment_model = self._load_onnx_pipeline(
+                    'sentiment-analysis', ORTModelForSequenceClassification, sentiment_model_name
+                )
+            else:
+                precision = (config or {}).get('precision', 'fp32')
+                
+                # Entity recognition model
+                self.entity_model = self._load_pipeline(
+                    'ner', AutoModelForTokenClassification, entity_model_name, precision
+                )
+                
+                # Sentiment analysis model
+                self.sentiment_model = self._load_pipeline(
+                    'sentiment-analysis', AutoModelForSequenceClassification,
+                    sentiment_model_name, precision
+                )
             
-            # Sentiment analysis model
-            self.sentiment_model = pipeline(
-                'sentiment-analysis',
-                model=f"crimeminer/sentiment-{MODEL_VERSIONS['sentiment']}",
-                device=self.device
+            # Entity and sentiment checkpoints often share a vocabulary, in which
+            # case one tokenization pass serves both models
+            entity_tokenizer = self.entity_model.tokenizer
+            sentiment_tokenizer = self.sentiment_model.tokenizer
+            self.shared_tokenizer = (
+                type(entity_tokenizer) is type(sentiment_tokenizer)
+                and entity_tokenizer.get_vocab() == sentiment_tokenizer.get_vocab()
             )
             
-            # Language detection model
-            self.nlp_model = spacy.load('en_core_web_lg')
+            # Language identification model
+            self.lang_id_model = fasttext.load_model(LANGUAGE_ID_MODEL_PATH)
+            
+            # Rule-based sentence splitter for chunk boundaries, no trained components
+            self.sentence_model = spacy.blank('en')
+            self.sentence_model.add_pipe('sentencizer')
             
         except Exception as e:
             logging.error(
@@ -194,57 +307,263 @@ class TextProcessor:
             )
             raise
 
-    @validate_input
-    @cache_result
-    def process_text(
+    def _load_pipeline(self, task: str, model_cls: Any, model_name: str, precision: str) -> Any:
+        """
+        Load a PyTorch pipeline, optionally with int8 linear layers
+        
+        On GPU int8 weights are loaded through bitsandbytes; on CPU the
+        linear layers are dynamically quantized after loading.
+        """
+        if precision != 'int8':
+            return pipeline(task, model=model_name, device=self.device)
+            
+        if self.device.type == 'cuda':
+            model = model_cls.from_pretrained(model_name, load_in_8bit=True, device_map='auto')
+            return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+            
+        nlp_pipeline = pipeline(task, model=model_name, device=self.device)
+        nlp_pipeline.model = torch.quantization.quantize_dynamic(
+            nlp_pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return nlp_pipeline
+
+    def _load_onnx_pipeline(self, task: str, model_cls: Any, model_name: str) -> Any:
+        """
+        Load an ONNX export of a model behind a transformers pipeline
+        
+        Exports are cached on disk per model and GPU architecture so the
+        ONNX conversion and TensorRT engine build only run once per node.
+        """
+        arch = 'cpu'
+        if torch.cuda.is_available():
+            major, minor = torch.cuda.get_device_capability(self.device)
+            arch = f"sm{major}{minor}"
+        cache_dir = os.path.join(ONNX_CACHE_DIR, f"{model_name.replace('/', '--')}-{arch}")
+        
+        provider_options = {
+            'trt_fp16_enable': True,
+            'trt_engine_cache_enable': True,
+            'trt_engine_cache_path': cache_dir
+        }
+        # The TensorRT engine cache shares this directory, so its existence alone
+        # does not mean the export finished
+        onnx_path = os.path.join(cache_dir, 'model.onnx')
+        if os.path.exists(onnx_path):
+            model = model_cls.from_pretrained(
+                cache_dir,
+                provider='TensorrtExecutionProvider',
+                provider_options=provider_options
+            )
+        else:
+            model = model_cls.from_pretrained(
+                model_name,
+                export=True,
+                provider='TensorrtExecutionProvider',
+                provider_options=provider_options
+            )
+            # Save beside the cache and move model.onnx in last, so an
+            # interrupted save never leaves a cache that looks complete
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=ONNX_CACHE_DIR) as staging_dir:
+                model.save_pretrained(staging_dir)
+                names = sorted(os.listdir(staging_dir), key=lambda name: name == 'model.onnx')
+                for name in names:
+                    os.replace(os.path.join(staging_dir, name), os.path.join(cache_dir, name))
+            
+        logging.info(
+            "ONNX model loaded",
+            extra={
+                'event_type': 'onnx_model_load',
+                'model_name': model_name,
+                'cache_dir': cache_dir,
+                'timestamp': time.time()
+            }
+        )
+        return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+    def _chunk_texts(self, texts: List[str], encodings: Any) -> List[Tuple[int, int, int]]:
+        """
+        Split pre-tokenized texts into spans that fit the entity model window
+        
+        Returns (text index, first token, end token) tuples
+        """
+        window = MAX_SEQUENCE_LENGTH - self.entity_model.tokenizer.num_special_tokens_to_add()
+        offset_mappings = encodings['offset_mapping']
+        
+        # Sentence boundaries are only needed for texts that must be split
+        long_indices = [i for i, offsets in enumerate(offset_mappings) if len(offsets) > window]
+        sentence_ends = {
+            text_idx: [sent.end_char for sent in doc.sents]
+            for text_idx, doc in zip(long_indices, self.sentence_model.pipe(
+                (texts[i] for i in long_indices),
+                batch_size=SENTENCE_BATCH_SIZE,
+                n_process=1
+            ))
+        }
+        
+        chunks = []
+        for text_idx, offsets in enumerate(offset_mappings):
+            if len(offsets) <= window:
+                chunks.append((text_idx, 0, len(offsets)))
+                continue
+                
+            token_ends = [offset[1] for offset in offsets]
+            sent_ends = sentence_ends[text_idx]
+            start = 0
+            while start < len(offsets):
+                end = min(start + window, len(offsets))
+                if end < len(offsets):
+                    # Cut after the last sentence that fits in the window
+                    sent_idx = bisect.bisect_right(sent_ends, token_ends[end - 1]) - 1
+                    if sent_idx >= 0:
+                        boundary = bisect.bisect_right(token_ends, sent_ends[sent_idx], start, end)
+                        if boundary > start:
+                            end = boundary
+                            
+                chunks.append((text_idx, start, end))
+                start = end
+                
+        return chunks
+
+    @staticmethod
+    def _forward(nlp_pipeline: Any, token_ids: List[List[int]]) -> torch.Tensor:
+        """
+        Run a pipeline's model on pre-tokenized ids, skipping the pipeline glue
+        """
+        tokenizer = nlp_pipeline.tokenizer
+        encoded = tokenizer.pad(
+            {'input_ids': [tokenizer.build_inputs_with_special_tokens(ids) for ids in token_ids]},
+            return_tensors='pt'
+        )
+        if 'token_type_ids' in tokenizer.model_input_names:
+            encoded['token_type_ids'] = torch.zeros_like(encoded['input_ids'])
+            
+        with torch.inference_mode():
+            return nlp_pipeline.model(**encoded.to(nlp_pipeline.device)).logits.float()
+
+    @staticmethod
+    def _bucket_by_length(lengths: List[int]) -> List[List[int]]:
+        """
+        Group indices into batches of similar length to minimize padding
+        """
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        return [
+            order[i:i + MAX_BATCH_SIZE]
+            for i in range(0, len(order), MAX_BATCH_SIZE)
+        ]
+
+    def process_texts(
         self,
-        text_content: str,
+        texts: List[str],
         analysis_types: List[str],
         options: Optional[Dict] = None
-    ) -> Dict[str, Any]:
+    ) -> List[Dict[str, Any]]:
         """
-        Process text with caching and CJIS-compliant logging
+        Process a batch of texts with length-bucketed model inference
         """
         try:
-            results = {
-                'metadata': {
-                    'timestamp': time.time(),
-                    'model_versions': MODEL_VERSIONS,
-                    'content_hash': hash(text_content)
+            for text_content in texts:
+                _check_text_content(text_content)
+                
+            results = [
+                {
+                    'metadata': {
+                        'timestamp': time.time(),
+                        'model_versions': MODEL_VERSIONS,
+                        'content_hash': _content_digest(text_content)
+                    }
                 }
-            }
+                for text_content in texts
+            ]
+            
+            # Tokenize once; entity chunks and a shared sentiment vocabulary reuse it
+            encodings = None
+            if 'entities' in analysis_types or ('sentiment' in analysis_types and self.shared_tokenizer):
+                encodings = self.entity_model.tokenizer(
+                    texts,
+                    add_special_tokens=False,
+                    return_offsets_mapping=True
+                )
             
             # Process requested analysis types
             if 'entities' in analysis_types:
-                entities = self.entity_model(
-                    text_content,
-                    batch_size=MAX_BATCH_SIZE
-                )
-                results['entities'] = [
-                    entity for entity in entities
-                    if entity['score'] >= CONFIDENCE_THRESHOLD
-                ]
-                
+                tokenizer = self.entity_model.tokenizer
+                id2label = self.entity_model.model.config.id2label
+                prefix = tokenizer.build_inputs_with_special_tokens([-1]).index(-1)
+                for result in results:
+                    result['entities'] = []
+                    
+                chunks = self._chunk_texts(texts, encodings)
+                for bucket in self._bucket_by_length([end - start for _, start, end in chunks]):
+                    logits = self._forward(self.entity_model, [
+                        encodings['input_ids'][text_idx][start:end]
+                        for text_idx, start, end in (chunks[i] for i in bucket)
+                    ])
+                    scores, label_ids = logits.softmax(-1).max(-1)
+                    scores, label_ids = scores.cpu().numpy(), label_ids.cpu().numpy()
+                    
+                    for row, i in enumerate(bucket):
+                        text_idx, start, end = chunks[i]
+                        input_ids = encodings['input_ids'][text_idx]
+                        offsets = encodings['offset_mapping'][text_idx]
+                        for token_idx in range(start, end):
+                            position = prefix + token_idx - start
+                            label = id2label[int(label_ids[row, position])]
+                            score = float(scores[row, position])
+                            if label == 'O' or score < CONFIDENCE_THRESHOLD:
+                                continue
+                            results[text_idx]['entities'].append({
+                                'entity': label,
+                                'score': score,
+                                # Token index in the whole document, as the pipeline
+                                # reported it for texts that fit one window
+                                'index': prefix + token_idx,
+                                'word': tokenizer.convert_ids_to_tokens(input_ids[token_idx]),
+                                'start': offsets[token_idx][0],
+                                'end': offsets[token_idx][1]
+                            })
+                            
             if 'sentiment' in analysis_types:
-                sentiment = self.sentiment_model(
-                    text_content,
-                    batch_size=MAX_BATCH_SIZE
-                )
-                results['sentiment'] = sentiment[0]
-                
+                tokenizer = self.sentiment_model.tokenizer
+                id2label = self.sentiment_model.model.config.id2label
+                window = MAX_SEQUENCE_LENGTH - tokenizer.num_special_tokens_to_add()
+                if self.shared_tokenizer:
+                    sentiment_ids = [ids[:window] for ids in encodings['input_ids']]
+                else:
+                    sentiment_ids = tokenizer(
+                        texts,
+                        add_special_tokens=False,
+                        truncation=True,
+                        max_length=window
+                    )['input_ids']
+                    
+                for bucket in self._bucket_by_length([len(ids) for ids in sentiment_ids]):
+                    logits = self._forward(self.sentiment_model, [sentiment_ids[i] for i in bucket])
+                    probs = logits.sigmoid() if logits.shape[-1] == 1 else logits.softmax(-1)
+                    scores, label_ids = probs.max(-1)
+                    for i, score, label_id in zip(bucket, scores.tolist(), label_ids.tolist()):
+                        results[i]['sentiment'] = {
+                            'label': id2label[label_id],
+                            'score': score
+                        }
+                        
             if 'language' in analysis_types:
-                doc = self.nlp_model(text_content)
-                results['language'] = {
-                    'detected': doc.lang_,
-                    'confidence': doc.lang_score
-                }
-                
+                # fastText predicts one line at a time
+                labels, probs = self.lang_id_model.predict(
+                    [text.replace('\n', ' ') for text in texts], k=1
+                )
+                for result, label, prob in zip(results, labels, probs):
+                    result['language'] = {
+                        'detected': label[0].replace('__label__', ''),
+                        'confidence': float(prob[0])
+                    }
+                    
             logging.info(
                 "Text processing completed",
                 extra={
                     'event_type': 'processing_complete',
                     'analysis_types': analysis_types,
-                    'content_hash': hash(text_content),
+                    'batch_size': len(texts),
                     'timestamp': time.time()
                 }
             )
@@ -257,11 +576,24 @@ class TextProcessor:
                 extra={
                     'event_type': 'processing_error',
                     'error_type': type(e).__name__,
-                    'content_hash': hash(text_content),
+                    'batch_size': len(texts),
                     'timestamp': time.time()
                 }
             )
             raise
 
+    @validate_input
+    @cache_result
+    def process_text(
+        self,
+        text_content: str,
+        analysis_types: List[str],
+        options: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Process text with caching and CJIS-compliant logging
+        """
+        return self.process_texts([text_content], analysis_types, options)[0]
+
 # Export the TextProcessor class
 __all__ = ['TextProcessor']
\ No newline at end of file
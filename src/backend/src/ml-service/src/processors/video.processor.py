@@ -2,31 +2,89 @@
 import numpy as np  # ^1.24.0
 import cv2  # ^4.8.0
 import torch  # ^2.0.0
+import torchvision  # ^0.15.1
 import json  # ^3.11
 import argparse  # ^3.11
 import logging  # ^3.11
-from concurrent.futures import ThreadPoolExecutor  # ^3.11
+from concurrent.futures import ThreadPoolExecutor, Future  # ^3.11
 import hashlib  # ^3.11
-from typing import Dict, List, Any, Optional
+import mmap  # ^3.11
+import queue  # ^3.11
+import threading  # ^3.11
+import os
+import ctypes
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Union
 from pathlib import Path
+from types import SimpleNamespace
 
 # Global constants
 SUPPORTED_ANALYSIS_TYPES = ["OBJECT_DETECTION", "FACE_DETECTION", "SCENE_RECOGNITION", "OCR"]
 MODEL_PATHS = {
-    "object_detection": "models/yolov5.pt",
-    "face_detection": "models/face_detect.pt",
-    "scene_recognition": "models/scene_classify.pt"
+    "OBJECT_DETECTION": "models/yolov5.pt",
+    "FACE_DETECTION": "models/face_detect.pt",
+    "SCENE_RECOGNITION": "models/scene_classify.pt"
 }
+# Analyses _process_batch actually runs; only their models are loaded
+BATCH_ANALYSIS_TYPES = ["OBJECT_DETECTION"]
 BATCH_SIZE = 32
 CONFIDENCE_THRESHOLD = 0.5
+NMS_IOU_THRESHOLD = 0.45
+MAX_DETECTIONS = 300
 MAX_WORKERS = 4
 CACHE_SIZE = 1000
-LOG_FORMAT = {
-    "timestamp": "%(asctime)s",
-    "level": "%(levelname)s",
-    "evidence_id": "%(evidence_id)s",
-    "message": "%(message)s"
-}
+PIPELINE_DEPTH = 2
+INFERENCE_BACKEND = os.environ.get("CRIMEMINER_INFERENCE_BACKEND", "pytorch")
+TRT_CACHE_DIR = os.environ.get("CRIMEMINER_TRT_CACHE_DIR", "/models/trt-cache")
+CUDA_HOST_REGISTER_MAPPED = 2
+CUDA_DEV_ATTR_CAN_USE_HOST_POINTER_FOR_REGISTERED_MEM = 91
+
+class JsonFormatter(logging.Formatter):
+    """Serializes each record as one JSON object with chain of custody fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "evidence_id": getattr(record, "evidence_id", None),
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+class MappedHostBuffer:
+    """
+    Page-locked host array registered as mapped memory and exposed to torch as
+    a CUDA tensor through ``__cuda_array_interface__``.
+    
+    Under unified addressing the mapped device pointer equals the host pointer,
+    so on integrated GPUs kernels read the frames in place with no copy.
+    """
+    
+    def __init__(self, shape: Tuple[int, ...]) -> None:
+        self.registered = False
+        self.host = np.empty(shape, dtype=np.uint8)
+        err = torch.cuda.cudart().cudaHostRegister(
+            self.host.ctypes.data, self.host.nbytes, CUDA_HOST_REGISTER_MAPPED
+        )
+        if int(err) != 0:
+            raise RuntimeError(f"cudaHostRegister failed with error {int(err)}")
+        self.registered = True
+        self.__cuda_array_interface__ = {
+            "shape": self.host.shape,
+            "typestr": self.host.dtype.str,
+            "data": (self.host.ctypes.data, False),
+            "version": 2
+        }
+    
+    def close(self) -> None:
+        """Unregister the pages; safe to call more than once."""
+        if self.registered:
+            self.registered = False
+            torch.cuda.cudart().cudaHostUnregister(self.host.ctypes.data)
+    
+    def __del__(self) -> None:
+        self.close()
 
 class VideoProcessor:
     """
@@ -65,7 +123,6 @@ class VideoProcessor:
         }
         
         # Setup logging with evidence chain of custody
-        self.logger = logging.getLogger(f"video_processor_{evidence_id}")
         self.logger = self._setup_logging()
         
         # Calculate file hash for integrity verification
@@ -83,76 +140,198 @@ class VideoProcessor:
         # Initialize frame cache
         self.frame_cache = {}
         
+        # Seconds per frame and sampling stride of the video being processed
+        self.inv_fps = 0.0
+        self.sample_stride = 1
+        
+        # Pinned host and device staging rings, reused across runs
+        self.host_staging = []
+        self.dev_staging = []
+        self.mapped_staging = []
+        
+        # CUDA graph of preprocess + detection forward, captured on first full batch
+        self.graph = None
+        self.static_input = None
+        self.static_output = None
+        
+        # PyTorch detector the TensorRT engine is built from, and the engine's
+        # (batch_size, height, width) once swapped in
+        self.trt_source_model = None
+        self.trt_engine_shape = None
+        
         self.logger.info(f"Initialized VideoProcessor for evidence {evidence_id}")
 
-    def _setup_logging(self) -> logging.Logger:
+    def _setup_logging(self) -> logging.LoggerAdapter:
         """Configure structured logging with chain of custody tracking."""
-        formatter = logging.Formatter(json.dumps(LOG_FORMAT))
-        handler = logging.StreamHandler()
-        handler.setFormatter(formatter)
+        base = logging.getLogger(f"video_processor_{self.evidence_id}")
         
-        logger = logging.getLogger(f"video_processor_{self.evidence_id}")
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+        # Loggers are process-wide, so reprocessing the same evidence must not
+        # stack another handler on top of the first
+        if not base.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(JsonFormatter())
+            base.addHandler(handler)
+            base.setLevel(logging.INFO)
+            # Records are already emitted as JSON here, don't repeat them via root
+            base.propagate = False
         
         # Add evidence_id to log context
-        logger = logging.LoggerAdapter(logger, {"evidence_id": self.evidence_id})
-        return logger
+        return logging.LoggerAdapter(base, {"evidence_id": self.evidence_id})
 
     def _calculate_file_hash(self) -> str:
         """Calculate SHA-256 hash of video file for integrity verification."""
         sha256_hash = hashlib.sha256()
-        with open(self.file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+        # Empty files cannot be mapped
+        if self.file_path.stat().st_size == 0:
+            return sha256_hash.hexdigest()
+        
+        # Hash straight from the page cache: no read buffers, and the update
+        # releases the GIL for the whole file
+        with open(self.file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sha256_hash.update(mm)
         return sha256_hash.hexdigest()
 
     def _setup_gpu(self, gpu_config: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize and configure GPU resources."""
         if not torch.cuda.is_available():
             self.logger.warning("GPU not available, falling back to CPU")
-            return {"device": "cpu"}
+            return {"device": "cpu", "dtype": torch.float32}
             
         device = torch.device("cuda:0")
         torch.cuda.set_device(device)
         
+        # Input shape is fixed for a whole video, so autotune convolutions once
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
+        
+        integrated = torch.cuda.get_device_properties(device).is_integrated
         return {
             "device": device,
+            "dtype": torch.float16,
+            # Jetson/Tegra: host and device share DRAM
+            "integrated": integrated,
+            # Frames are only read in place where mapped pages keep their host address
+            "map_host_memory": integrated and self._can_use_host_pointer(device),
             "memory_allocated": torch.cuda.memory_allocated(),
             "memory_reserved": torch.cuda.memory_reserved()
         }
 
+    @staticmethod
+    def _can_use_host_pointer(device: torch.device) -> bool:
+        """
+        Whether registered host memory has the same address on the device,
+        which ``MappedHostBuffer`` relies on. torch does not expose device
+        attributes, so ask the CUDA runtime it has already loaded.
+        """
+        major = torch.version.cuda.split(".")[0]
+        for name in (f"libcudart.so.{major}.0", f"libcudart.so.{major}", "libcudart.so"):
+            try:
+                cudart = ctypes.CDLL(name)
+                break
+            except OSError:
+                continue
+        else:
+            return False
+        value = ctypes.c_int()
+        err = cudart.cudaDeviceGetAttribute(
+            ctypes.byref(value), CUDA_DEV_ATTR_CAN_USE_HOST_POINTER_FOR_REGISTERED_MEM, device.index
+        )
+        return err == 0 and value.value == 1
+
     def _load_models(self) -> None:
         """Load and initialize required ML models."""
         device = self.gpu_resources["device"]
         
         for analysis_type in self.analysis_types:
-            if analysis_type in MODEL_PATHS:
+            if analysis_type in MODEL_PATHS and analysis_type in BATCH_ANALYSIS_TYPES:
                 try:
                     model_path = MODEL_PATHS[analysis_type]
                     model = torch.load(model_path, map_location=device)
                     model.eval()
+                    model = model.to(dtype=self.gpu_resources["dtype"], memory_format=torch.channels_last)
                     self.models[analysis_type] = model
                     self.logger.info(f"Loaded model for {analysis_type}")
                 except Exception as e:
                     self.logger.error(f"Failed to load model for {analysis_type}: {str(e)}")
                     raise
 
+    def _compile_tensorrt(self, batch_size: int, frame_shape: Tuple[int, int, int]) -> None:
+        """
+        Swap the detection model for a Torch-TensorRT FP16 engine.
+        
+        Engines are specific to GPU architecture and input resolution, so they are
+        cached on disk keyed by both and only built on the first run of a shape.
+        Repeated runs at the shape already swapped in are a no-op.
+        """
+        if self.gpu_resources["device"] == "cpu":
+            self.logger.warning("TensorRT backend requires a GPU, keeping PyTorch inference")
+            return
+        
+        height, width, _ = frame_shape
+        if self.trt_engine_shape == (batch_size, height, width):
+            return
+        
+        # Only needed on TensorRT nodes
+        import torch_tensorrt  # ^1.4.0
+        
+        # Always build from the PyTorch model, never from a previous engine
+        if self.trt_source_model is None:
+            self.trt_source_model = self.models["OBJECT_DETECTION"]
+        
+        major, minor = torch.cuda.get_device_capability(self.gpu_resources["device"])
+        engine_path = os.path.join(
+            TRT_CACHE_DIR, f"object_detection-sm{major}{minor}-b{batch_size}-{height}x{width}.ts"
+        )
+        
+        if os.path.exists(engine_path):
+            engine = torch.jit.load(engine_path, map_location=self.gpu_resources["device"])
+        else:
+            os.makedirs(TRT_CACHE_DIR, exist_ok=True)
+            engine = torch_tensorrt.compile(
+                self.trt_source_model,
+                ir="ts",
+                inputs=[torch_tensorrt.Input(
+                    min_shape=(1, 3, height, width),
+                    opt_shape=(batch_size, 3, height, width),
+                    max_shape=(batch_size, 3, height, width),
+                    dtype=torch.half
+                )],
+                enabled_precisions={torch.half}
+            )
+            torch.jit.save(engine, engine_path)
+            self.logger.info(f"Built TensorRT engine at {engine_path}")
+        
+        self.models["OBJECT_DETECTION"] = engine
+        self.trt_engine_shape = (batch_size, height, width)
+        # Any captured graph belongs to the previous model
+        self.graph = None
+
+    @torch.inference_mode()
     def process_video(
         self,
         batch_size: int = BATCH_SIZE,
-        confidence_threshold: float = CONFIDENCE_THRESHOLD
+        confidence_threshold: float = CONFIDENCE_THRESHOLD,
+        sample_stride: int = 1
     ) -> Dict[str, Any]:
         """
         Process video with parallel frame analysis and batch processing.
         
+        Frames are decoded with NVDEC straight into GPU memory when available,
+        otherwise on the CPU with OpenCV.
+        
         Args:
             batch_size: Number of frames to process in parallel
             confidence_threshold: Minimum confidence score for detections
+            sample_stride: Analyze every Nth frame
             
         Returns:
             Dict containing analysis results and processing metadata
         """
+        if not isinstance(sample_stride, int) or sample_stride < 1:
+            raise ValueError(f"sample_stride must be an integer >= 1, got {sample_stride!r}")
+        
         self.processing_stats["start_time"] = torch.cuda.Event(enable_timing=True)
         self.processing_stats["end_time"] = torch.cuda.Event(enable_timing=True)
         
@@ -164,6 +343,8 @@ class VideoProcessor:
             # Extract video metadata
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             fps = cap.get(cv2.CAP_PROP_FPS)
+            self.inv_fps = 1.0 / fps if fps > 0 else 0.0
+            self.sample_stride = sample_stride
             
             self.processing_stats["start_time"].record()
             
@@ -178,34 +359,35 @@ class VideoProcessor:
                 "analysis_results": {}
             }
             
-            # Process video in batches
-            frame_batch = []
-            batch_indices = []
+            # Prefer hardware decode into GPU memory, fall back to OpenCV
+            frames_on_device = True
+            gpu_reader = self._open_gpu_reader()
+            cudacodec_reader = self._open_cudacodec_reader() if gpu_reader is None else None
+            if gpu_reader is not None:
+                frames = self._iter_gpu_frames(gpu_reader, sample_stride)
+            elif cudacodec_reader is not None:
+                frames = self._iter_cudacodec_frames(cudacodec_reader, sample_stride)
+            else:
+                frames_on_device = False
+                frames = self._iter_cpu_frames(cap, total_frames, sample_stride)
             
-            for frame_idx in range(total_frames):
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                    
-                frame_batch.append(frame)
-                batch_indices.append(frame_idx)
-                
-                if len(frame_batch) == batch_size or frame_idx == total_frames - 1:
-                    # Process batch with GPU acceleration
-                    batch_tensor = torch.from_numpy(np.stack(frame_batch)).to(self.gpu_resources["device"])
-                    
-                    # Run requested analyses
-                    for analysis_type in self.analysis_types:
-                        if analysis_type not in results["analysis_results"]:
-                            results["analysis_results"][analysis_type] = []
-                            
-                        if analysis_type == "OBJECT_DETECTION":
-                            detections = self.detect_objects(batch_tensor, confidence_threshold)
-                            results["analysis_results"][analysis_type].extend(detections)
-                    
-                    self.processing_stats["frames_processed"] += len(frame_batch)
-                    frame_batch = []
-                    batch_indices = []
+            frame_shape = (
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                3
+            )
+            if INFERENCE_BACKEND == "tensorrt" and "OBJECT_DETECTION" in self.models:
+                self._compile_tensorrt(batch_size, frame_shape)
+            
+            # Overlap decode, host-to-device copy and inference
+            self._run_pipeline(
+                frames,
+                frames_on_device,
+                batch_size,
+                frame_shape,
+                results,
+                confidence_threshold
+            )
             
             self.processing_stats["end_time"].record()
             torch.cuda.synchronize()
@@ -231,11 +413,398 @@ class VideoProcessor:
             if 'cap' in locals():
                 cap.release()
 
+    def _open_gpu_reader(self) -> Optional[torchvision.io.VideoReader]:
+        """Open an NVDEC-backed reader, or return None when GPU decode is unavailable."""
+        if not torch.cuda.is_available():
+            return None
+            
+        # The reader binds the backend at construction, so restore the previous
+        # one straight after; set_video_backend raises when torchvision was built
+        # without GPU decoding
+        previous_backend = torchvision.get_video_backend()
+        try:
+            torchvision.set_video_backend("cuda")
+            return torchvision.io.VideoReader(str(self.file_path), "video")
+        except (RuntimeError, ValueError) as e:
+            self.logger.warning(f"GPU video decode unavailable, falling back to OpenCV: {str(e)}")
+            return None
+        finally:
+            torchvision.set_video_backend(previous_backend)
+
+    def _iter_gpu_frames(
+        self,
+        reader: torchvision.io.VideoReader,
+        sample_stride: int
+    ) -> Iterator[Tuple[int, torch.Tensor]]:
+        """Yield sampled frames decoded by NVDEC as HWC tensors in GPU memory."""
+        for frame_idx, frame in enumerate(reader):
+            if frame_idx % sample_stride != 0:
+                continue
+            # NVDEC output is RGB; match the BGR layout of the OpenCV path
+            yield frame_idx, frame["data"].flip(-1)
+
+    def _open_cudacodec_reader(self) -> Optional[Any]:
+        """Open an OpenCV NVDEC reader, or return None when OpenCV lacks CUDA support."""
+        if not hasattr(cv2, "cudacodec") or cv2.cuda.getCudaEnabledDeviceCount() == 0:
+            return None
+        try:
+            return cv2.cudacodec.createVideoReader(str(self.file_path))
+        except cv2.error as e:
+            self.logger.warning(f"OpenCV GPU video decode unavailable, falling back to CPU: {str(e)}")
+            return None
+
+    def _iter_cudacodec_frames(self, reader: Any, sample_stride: int) -> Iterator[Tuple[int, torch.Tensor]]:
+        """Yield sampled frames decoded by OpenCV's NVDEC reader as HWC tensors in GPU memory."""
+        frame_idx = 0
+        while True:
+            ret, gpu_frame = reader.nextFrame()
+            if not ret:
+                return
+            if frame_idx % sample_stride == 0:
+                # Wrap the pitched BGRA GpuMat without a host round trip, then drop
+                # alpha; the clone detaches from memory the reader reuses
+                height, width = gpu_frame.size()[::-1]
+                view = SimpleNamespace(__cuda_array_interface__={
+                    "shape": (height, width, 4),
+                    "strides": (gpu_frame.step, 4, 1),
+                    "typestr": "|u1",
+                    "data": (gpu_frame.cudaPtr(), False),
+                    "version": 2
+                })
+                yield frame_idx, torch.as_tensor(view, device=self.gpu_resources["device"])[..., :3].clone()
+            frame_idx += 1
+
+    def _iter_cpu_frames(
+        self,
+        cap: cv2.VideoCapture,
+        total_frames: int,
+        sample_stride: int
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield sampled frames decoded on the CPU by OpenCV.
+        
+        Frames are always grabbed to keep position, but only every
+        ``sample_stride``-th frame is retrieved, which skips the colour
+        conversion and image reconstruction for dropped frames.
+        
+        Every frame is retrieved into the same array, so the caller must copy
+        it out (into its staging batch) before pulling the next one.
+        """
+        frame = None
+        for frame_idx in range(total_frames):
+            if not cap.grab():
+                return
+            if frame_idx % sample_stride != 0:
+                continue
+                
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                return
+            yield frame_idx, frame
+
+    def _run_pipeline(
+        self,
+        frames: Iterator[Tuple[int, Union[np.ndarray, torch.Tensor]]],
+        frames_on_device: bool,
+        batch_size: int,
+        frame_shape: Tuple[int, int, int],
+        results: Dict[str, Any],
+        confidence_threshold: float
+    ) -> None:
+        """
+        Run decode, host-to-device copy and inference as overlapping stages.
+        
+        A producer thread decodes and stages batches into a ring of pinned host
+        buffers. On CUDA, each batch is copied into a double-buffered device
+        tensor on a copy stream and analyzed on a separate compute stream, with
+        CUDA events ordering the stages so that decode, copy and compute of
+        consecutive batches run concurrently. On integrated GPUs the staging
+        ring is mapped memory the GPU reads directly, so the copy is skipped.
+        """
+        use_cuda = torch.cuda.is_available() and self.gpu_resources["device"] != "cpu"
+        mapped = use_cuda and self.gpu_resources.get("map_host_memory", False)
+        
+        host_buffers = []
+        device_buffers = []
+        if not frames_on_device:
+            host_buffers, device_buffers = self._staging_buffers(batch_size, frame_shape, use_cuda, mapped)
+            # Registration can still fail, in which case the pinned ring is used
+            mapped = mapped and bool(self.mapped_staging)
+        
+        copy_stream = torch.cuda.Stream() if use_cuda else None
+        compute_stream = torch.cuda.Stream() if use_cuda else None
+        computed = [None] * PIPELINE_DEPTH
+        
+        # Each slot is handed back with the event of its last device-side read
+        free_slots = queue.Queue()
+        for slot in range(PIPELINE_DEPTH):
+            free_slots.put((slot, None))
+        ready = queue.Queue()
+        stop = threading.Event()
+        
+        # Capture before the producer exists: a global-mode capture is
+        # invalidated by CUDA calls from any other thread, and the producer
+        # stacks or stages frames on the device
+        if use_cuda and self.graph is None and "OBJECT_DETECTION" in self.models:
+            self._capture_graph(
+                self.models["OBJECT_DETECTION"],
+                torch.zeros((batch_size, *frame_shape), dtype=torch.uint8, device=self.gpu_resources["device"])
+            )
+        
+        producer = threading.Thread(
+            target=self._decode_batches,
+            args=(frames, batch_size, host_buffers, free_slots, ready, stop),
+            daemon=True
+        )
+        producer.start()
+        
+        pending = []
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                    
+                slot, batch, valid, base_frame_idx = item
+                if not use_cuda:
+                    self._process_batch(batch, valid, base_frame_idx, results, confidence_threshold, pending)
+                    free_slots.put((slot, None))
+                    continue
+                
+                if frames_on_device:
+                    # Batch was stacked on the default stream by the producer
+                    batch_tensor = batch
+                    compute_stream.wait_stream(torch.cuda.default_stream())
+                    batch_tensor.record_stream(compute_stream)
+                    free_slots.put((slot, None))
+                elif mapped:
+                    # Producer writes are visible to the GPU, nothing to copy
+                    batch_tensor = device_buffers[slot]
+                else:
+                    batch_tensor = device_buffers[slot]
+                    with torch.cuda.stream(copy_stream):
+                        # Don't overwrite a device buffer still being analyzed
+                        if computed[slot] is not None:
+                            copy_stream.wait_event(computed[slot])
+                        batch_tensor.copy_(batch, non_blocking=True)
+                        copied = torch.cuda.Event()
+                        copied.record(copy_stream)
+                    free_slots.put((slot, copied))
+                    compute_stream.wait_event(copied)
+                
+                with torch.cuda.stream(compute_stream):
+                    self._process_batch(batch_tensor, valid, base_frame_idx, results, confidence_threshold, pending)
+                    computed[slot] = torch.cuda.Event()
+                    computed[slot].record(compute_stream)
+                if mapped and not frames_on_device:
+                    free_slots.put((slot, computed[slot]))
+            
+            if use_cuda:
+                compute_stream.synchronize()
+            
+            # Collect post-processing in batch order
+            for analysis_type, future in pending:
+                results["analysis_results"][analysis_type].append(future.result())
+            if "OBJECT_DETECTION" in results["analysis_results"]:
+                results["analysis_results"]["OBJECT_DETECTION"] = self._concat_detections(
+                    results["analysis_results"]["OBJECT_DETECTION"]
+                )
+        finally:
+            stop.set()
+            free_slots.put((None, None))
+            producer.join()
+
+    def _staging_buffers(
+        self,
+        batch_size: int,
+        frame_shape: Tuple[int, int, int],
+        use_cuda: bool,
+        mapped: bool = False
+    ) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
+        """
+        Return the pinned host and device staging rings, reallocating only when
+        the batch shape changes so repeated runs reuse the same pinned pages.
+        
+        With ``mapped`` both rings alias the same mapped host memory.
+        """
+        shape = (batch_size, *frame_shape)
+        if self.host_staging and self.host_staging[0].shape == shape:
+            return self.host_staging, self.dev_staging
+        
+        self._release_mapped_staging()
+        
+        if mapped:
+            try:
+                for _ in range(PIPELINE_DEPTH):
+                    self.mapped_staging.append(MappedHostBuffer(shape))
+            except RuntimeError as e:
+                # Tegra parts before Xavier cannot register host memory as mapped
+                self.logger.warning(f"Mapped staging unavailable, copying frames instead: {str(e)}")
+                self._release_mapped_staging()
+                self.gpu_resources["map_host_memory"] = False
+            else:
+                self.host_staging = [torch.from_numpy(buffer.host) for buffer in self.mapped_staging]
+                self.dev_staging = [
+                    torch.as_tensor(buffer, device=self.gpu_resources["device"])
+                    for buffer in self.mapped_staging
+                ]
+                return self.host_staging, self.dev_staging
+        
+        self.host_staging = [
+            torch.empty(shape, dtype=torch.uint8, pin_memory=use_cuda)
+            for _ in range(PIPELINE_DEPTH)
+        ]
+        self.dev_staging = []
+        if use_cuda:
+            self.dev_staging = [
+                torch.empty(shape, dtype=torch.uint8, device=self.gpu_resources["device"])
+                for _ in range(PIPELINE_DEPTH)
+            ]
+        return self.host_staging, self.dev_staging
+
+    def _release_mapped_staging(self) -> None:
+        """Unregister the mapped staging ring, if any."""
+        for buffer in self.mapped_staging:
+            buffer.close()
+        self.mapped_staging = []
+
+    def close(self) -> None:
+        """Release the staging rings and stop the post-processing workers."""
+        self._release_mapped_staging()
+        self.host_staging = []
+        self.dev_staging = []
+        self.executor.shutdown(wait=True)
+
+    def __del__(self) -> None:
+        # __init__ may have failed before the executor existed
+        if hasattr(self, "executor"):
+            self.close()
+
+    def _decode_batches(
+        self,
+        frames: Iterator[Tuple[int, Union[np.ndarray, torch.Tensor]]],
+        batch_size: int,
+        host_buffers: List[torch.Tensor],
+        free_slots: queue.Queue,
+        ready: queue.Queue,
+        stop: threading.Event
+    ) -> None:
+        """
+        Producer thread: group decoded frames into batches and stage them for the consumer.
+        
+        CPU-decoded frames are copied straight into a pinned slot as they
+        arrive, so no intermediate batch array is ever built.
+        """
+        try:
+            # Only GPU-decoded frames are collected; CPU frames go straight to the slot
+            frame_batch = []
+            count = 0
+            base_frame_idx = 0
+            slot = None
+            
+            for frame_idx, frame in frames:
+                if count == 0:
+                    slot = self._acquire_slot(free_slots, stop)
+                    if slot is None:
+                        return
+                    base_frame_idx = frame_idx
+                        
+                if isinstance(frame, torch.Tensor):
+                    # Frames decoded on the GPU never leave device memory
+                    frame_batch.append(frame)
+                else:
+                    np.copyto(host_buffers[slot][count].numpy(), frame)
+                count += 1
+                
+                if count == batch_size:
+                    batch = self._staged_batch(frame_batch, host_buffers, slot, count)
+                    ready.put((slot, batch, count, base_frame_idx))
+                    frame_batch = []
+                    count = 0
+            
+            # Flush the final partial batch, padded to the full batch shape
+            if count:
+                batch = self._staged_batch(frame_batch, host_buffers, slot, count, batch_size)
+                ready.put((slot, batch, count, base_frame_idx))
+            ready.put(None)
+        except Exception as e:
+            ready.put(e)
+
+    def _acquire_slot(self, free_slots: queue.Queue, stop: threading.Event) -> Optional[int]:
+        """Wait for a free staging slot; returns None once the consumer has stopped."""
+        slot, copied = free_slots.get()
+        if stop.is_set():
+            return None
+            
+        # Wait until the previous copy out of this slot has finished
+        if copied is not None:
+            copied.synchronize()
+        return slot
+
+    def _staged_batch(
+        self,
+        frame_batch: List[torch.Tensor],
+        host_buffers: List[torch.Tensor],
+        slot: int,
+        count: int,
+        batch_size: Optional[int] = None
+    ) -> torch.Tensor:
+        """
+        Return the batch tensor for a filled slot.
+        
+        Short batches are zero-padded to ``batch_size`` so every forward has the
+        same shape, keeping the CUDA graph, cuDNN autotuning and TensorRT engine
+        valid; callers mask out detections from the padding.
+        """
+        batch_size = batch_size or count
+        if frame_batch:
+            padding = [torch.zeros_like(frame_batch[0])] * (batch_size - count)
+            return torch.stack(frame_batch + padding)
+        if count < batch_size:
+            host_buffers[slot][count:batch_size].zero_()
+        return host_buffers[slot][:batch_size]
+
+    def _process_batch(
+        self,
+        batch_tensor: torch.Tensor,
+        valid: int,
+        base_frame_idx: int,
+        results: Dict[str, Any],
+        confidence_threshold: float,
+        pending: List[Tuple[str, Future]]
+    ) -> None:
+        """
+        Run the requested analyses on a batch of frames.
+        
+        Only the GPU work runs here; host-side post-processing is submitted to
+        the executor so it overlaps with the next batch's forward pass. Futures
+        are appended to ``pending`` in batch order. Only the first ``valid``
+        frames are real; the rest is padding. ``base_frame_idx`` is the video
+        frame index of the first frame in the batch.
+        """
+        # Run requested analyses
+        for analysis_type in self.analysis_types:
+            if analysis_type not in results["analysis_results"]:
+                results["analysis_results"][analysis_type] = []
+                
+            # Only object detection runs per batch; the face and scene models
+            # have no consumer here, so there is no second head to fuse onto
+            # a shared backbone
+            if analysis_type == "OBJECT_DETECTION" and analysis_type in self.models:
+                kept, ready = self._detect_on_device(batch_tensor, confidence_threshold, valid)
+                pending.append((analysis_type, self.executor.submit(
+                    self._postprocess_preds, kept, ready, base_frame_idx, self.sample_stride
+                )))
+        
+        self.processing_stats["frames_processed"] += valid
+
     def detect_objects(
         self,
         batch_frames: torch.Tensor,
         confidence_threshold: float
-    ) -> List[Dict[str, Any]]:
+    ) -> Dict[str, np.ndarray]:
         """
         GPU-accelerated object detection with batch processing.
         
@@ -244,45 +813,165 @@ class VideoProcessor:
             confidence_threshold: Minimum confidence score for detections
             
         Returns:
-            List of detected objects with metadata and confidence scores
+            Detections as a structure of arrays: ``frame_idx`` (N,), ``bbox``
+            (N, 4), ``confidence`` (N,), ``class_id`` (N,) and ``timestamp`` (N,)
+        """
+        return self._postprocess_preds(
+            *self._detect_on_device(batch_frames, confidence_threshold, batch_frames.shape[0])
+        )
+
+    def _detect_on_device(
+        self,
+        batch_frames: torch.Tensor,
+        confidence_threshold: float,
+        valid: int
+    ) -> Tuple[torch.Tensor, Optional[torch.cuda.Event]]:
+        """
+        Run YOLOv5, then decode and filter its raw output on the frames'
+        device, dropping rows from padded frames at index ``valid`` and beyond.
+        
+        Returns the surviving [frame, x1, y1, x2, y2, conf, cls] rows, still on
+        the device, and an event marking when they are ready (None on CPU).
         """
         try:
             model = self.models["OBJECT_DETECTION"]
             
-            # Preprocess frames for YOLO
-            preprocessed_batch = self._preprocess_frames(batch_frames)
+            # Preprocess frames for YOLO and run inference
+            if batch_frames.is_cuda and (self.graph is None or batch_frames.shape == self.static_input.shape):
+                predictions = self._graphed_forward(model, batch_frames)
+            else:
+                predictions = model(self._preprocess_frames(batch_frames))
             
-            # Run inference
-            with torch.no_grad():
-                predictions = model(preprocessed_batch)
+            # Eval-mode YOLOv5 returns (pred, feature_maps); pred is the raw
+            # (B, anchors, 5 + classes) tensor of [cx, cy, w, h, obj, cls_0..cls_n]
+            if isinstance(predictions, (tuple, list)):
+                predictions = predictions[0]
+            batch, anchors = predictions.shape[:2]
+            rows = predictions.reshape(batch * anchors, -1).float()
+            frame_ids = torch.arange(batch, device=rows.device).repeat_interleave(anchors)
             
-            # Post-process detections
-            detections = []
-            for frame_idx, frame_predictions in enumerate(predictions):
-                frame_detections = []
-                
-                for pred in frame_predictions:
-                    if pred[4] >= confidence_threshold:  # Confidence score
-                        detection = {
-                            "frame_idx": frame_idx,
-                            "bbox": pred[:4].tolist(),
-                            "confidence": float(pred[4]),
-                            "class_id": int(pred[5]),
-                            "timestamp": frame_idx / self.processing_stats["metadata"]["fps"]
-                        }
-                        frame_detections.append(detection)
-                
-                detections.extend(frame_detections)
+            # Final confidence is objectness times the best class score
+            class_conf, class_ids = rows[:, 5:].max(dim=1)
+            conf = rows[:, 4] * class_conf
+            boxes = torchvision.ops.box_convert(rows[:, :4], "cxcywh", "xyxy")
+            
+            # Filter on the GPU before NMS
+            mask = (conf >= confidence_threshold) & (frame_ids < valid)
+            boxes, conf, class_ids, frame_ids = boxes[mask], conf[mask], class_ids[mask], frame_ids[mask]
+            
+            # Class-aware NMS for every frame of the batch in one call
+            keep = torchvision.ops.batched_nms(
+                boxes,
+                conf,
+                (frame_ids << 16) | class_ids,
+                NMS_IOU_THRESHOLD
+            )
+            
+            # Cap detections per frame: group by frame keeping score order, then
+            # rank within each group
+            keep = keep[torch.sort(frame_ids[keep], stable=True).indices]
+            kept_frames = frame_ids[keep]
+            rank = torch.arange(len(keep), device=rows.device) - torch.searchsorted(kept_frames, kept_frames)
+            keep = keep[rank < MAX_DETECTIONS]
+            
+            kept = torch.cat([
+                frame_ids[keep, None].float(),
+                boxes[keep],
+                conf[keep, None],
+                class_ids[keep, None].float()
+            ], dim=1)
             
-            return detections
+            ready = None
+            if kept.is_cuda:
+                # Workers copy on their own stream, so they must wait for this one
+                ready = torch.cuda.Event()
+                ready.record()
+            return kept, ready
             
         except Exception as e:
             self.logger.error(f"Error in object detection: {str(e)}")
             raise
 
+    def _postprocess_preds(
+        self,
+        kept: torch.Tensor,
+        ready: Optional[torch.cuda.Event],
+        base_frame_idx: int = 0,
+        frame_stride: int = 1
+    ) -> Dict[str, np.ndarray]:
+        """
+        Copy filtered detection rows to host and split them into columns, mapping
+        batch positions back to video frame indices.
+        """
+        try:
+            if ready is not None:
+                ready.synchronize()
+            kept = kept.cpu().numpy()
+            
+            # Post-process detections
+            frame_idx = base_frame_idx + kept[:, 0].astype(np.int64) * frame_stride
+            return {
+                "frame_idx": frame_idx,
+                "bbox": kept[:, 1:5],
+                "confidence": kept[:, 5],
+                "class_id": kept[:, 6].astype(np.int32),
+                "timestamp": frame_idx.astype(np.float32) * self.inv_fps
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in object detection post-processing: {str(e)}")
+            raise
+
+    @staticmethod
+    def _concat_detections(batches: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """Concatenate per-batch detection columns into one structure of arrays."""
+        if not batches:
+            return {
+                "frame_idx": np.empty(0, dtype=np.int64),
+                "bbox": np.empty((0, 4), dtype=np.float32),
+                "confidence": np.empty(0, dtype=np.float32),
+                "class_id": np.empty(0, dtype=np.int32),
+                "timestamp": np.empty(0, dtype=np.float32)
+            }
+        return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+    def _graphed_forward(self, model: torch.nn.Module, batch_frames: torch.Tensor) -> Any:
+        """
+        Run preprocess + forward by replaying a captured CUDA graph.
+        
+        The graph is captured once for the shape of the first batch, unless
+        the pipeline already captured it, and replayed for every later batch
+        of that shape, removing per-kernel launch overhead. The returned
+        predictions live in static memory that the next replay overwrites.
+        """
+        if self.graph is None:
+            self._capture_graph(model, batch_frames)
+        
+        self.static_input.copy_(batch_frames, non_blocking=True)
+        self.graph.replay()
+        return self.static_output
+
+    def _capture_graph(self, model: torch.nn.Module, example_frames: torch.Tensor) -> None:
+        """Capture preprocess + forward for batches shaped like ``example_frames``."""
+        self.static_input = torch.empty_like(example_frames)
+        
+        # Warm up on a side stream so lazy init is not captured
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(3):
+                self.static_output = model(self._preprocess_frames(self.static_input))
+        torch.cuda.current_stream().wait_stream(side_stream)
+        
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.static_output = model(self._preprocess_frames(self.static_input))
+        self.logger.info(f"Captured CUDA graph for batch shape {tuple(example_frames.shape)}")
+
     def _preprocess_frames(self, frames: torch.Tensor) -> torch.Tensor:
         """Preprocess frames for model inference."""
-        # Normalize and transform frames
-        frames = frames.float() / 255.0
-        frames = frames.permute(0, 3, 1, 2)  # BHWC to BCHW
-        return frames
\ No newline at end of file
+        # BHWC to BCHW as a view; channels_last keeps the HWC memory order, so the
+        # cast is a single contiguous pass and the scale runs in place
+        frames = frames.permute(0, 3, 1, 2)
+        frames = frames.to(dtype=self.gpu_resources["dtype"], memory_format=torch.channels_last)
+        return frames.mul_(1.0 / 255.0)
\ No newline at end of file